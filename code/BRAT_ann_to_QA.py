@@ -1,12 +1,18 @@
+import io
 import os
 import re
 import random
 import json
 import argparse
 import logging
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Dict, Optional, Tuple
 from brat_records_class import BRAT_record
-from utils import generate_unique_id, save_json
+from utils import save_json, DASH_TRANSLATION_TABLE
+
+# compiled once, used for every annotation line
+_WS_RE = re.compile(r'\s+')
 
 def setup_logging():
     """Set up logging configuration."""
@@ -19,23 +25,34 @@ def parse_arguments():
     parser.add_argument("--version", default="v2", help="Version of the test dataset")
     parser.add_argument("--savename", default="TE_QA_dataset.json", help="Saving name of the test dataset")
     parser.add_argument("--threshold", type=float, default=0.5, help="Threshold for unanswerable questions")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: number of CPUs)")
     return parser.parse_args()
 
-def get_synonyms(target: str, synonyms_list: List[List[str]]) -> List[str]:
-    """Find synonyms for a given target from a list of synonym groups."""
-    for synonyms in synonyms_list:
-        if target in synonyms:
-            return synonyms
-    return [target]
-
-def process_entities(annotation_file: List[str]) -> Dict[str, List[str]]:
-    """Process entities from the annotation file."""
-    entities = [re.split(r'[\s\t]+', line.strip(), 4) for line in annotation_file if line.startswith("T")]
+def build_synonyms_index(synonyms_list: List[List[str]]) -> Dict[str, List[str]]:
+    """Map every name to its synonym group (the first group it appears in)."""
+    return {name: synonyms for synonyms in reversed(synonyms_list) for name in synonyms}
+
+def get_synonyms(target: str, synonyms_index: Dict[str, List[str]]) -> List[str]:
+    """Find synonyms for a given target from the synonyms index."""
+    return synonyms_index.get(target, [target])
+
+def bucket_lines(annotation_file: List[str]) -> Tuple[List[str], List[str], List[str]]:
+    """Split the annotation file into entity (T), event (E) and relation (R) lines in a single pass."""
+    buckets = {"T": [], "E": [], "R": []}
+    for line in annotation_file:
+        bucket = buckets.get(line[:1])
+        if bucket is not None:
+            bucket.append(line)
+    return buckets["T"], buckets["E"], buckets["R"]
+
+def process_entities(entity_lines: List[str]) -> Dict[str, List[str]]:
+    """Process entities from the entity lines of the annotation file."""
+    entities = [_WS_RE.split(line.strip(), maxsplit=4) for line in entity_lines]
     return {entity[0]: entity[2:] for entity in entities}
 
-def process_events(annotation_file: List[str]) -> List[Dict[str, str]]:
-    """Process events from the annotation file."""
-    events_split = [re.split(r'[\s\t]+', line.strip(), 4) for line in annotation_file if line.startswith("E")]
+def process_events(event_lines: List[str]) -> List[Dict[str, str]]:
+    """Process events from the event lines of the annotation file."""
+    events_split = [_WS_RE.split(line.strip(), maxsplit=4) for line in event_lines]
     events_list = []
     for event in events_split:
         event_dict = {}
@@ -46,11 +63,10 @@ def process_events(annotation_file: List[str]) -> List[Dict[str, str]]:
         events_list.append(event_dict)
     return events_list
 
-def process_relations(annotation_file: List[str], entities: Dict[str, List[str]]) -> List[List[str]]:
-    """Process relations from the annotation file."""
-    relations = [line for line in annotation_file if line.startswith("R")]
+def process_relations(relation_lines: List[str], entities: Dict[str, List[str]]) -> List[List[str]]:
+    """Process relations from the relation lines of the annotation file."""
     synonyms_list = []
-    for relation in relations:
+    for relation in relation_lines:
         arg1, arg2 = relation.split("\t")[1].split(" ")[1:]
         arg1, arg2 = arg1.split(":")[1], arg2.split(":")[1]
         name1, name2 = entities[arg1][2], entities[arg2][2]
@@ -64,11 +80,15 @@ def process_relations(annotation_file: List[str], entities: Dict[str, List[str]]
 
 def from_annotation_file_to_records(annotation_file: List[str], context: str) -> List[BRAT_record]:
     """Convert a BRAT annotation file to a list of BRAT_record objects."""
-    entities = process_entities(annotation_file)
-    events_list = process_events(annotation_file)
-    synonyms_list = process_relations(annotation_file, entities)
+    entity_lines, event_lines, relation_lines = bucket_lines(annotation_file)
+    entities = process_entities(entity_lines)
+    events_list = process_events(event_lines)
+    synonyms_list = process_relations(relation_lines, entities)
+    synonyms_index = build_synonyms_index(synonyms_list)
 
-    start_indices = {entity_vals[2]: entity_vals[0] for entity_vals in entities.values()}
+    # flat lookups: entity id -> entity name, entity name -> start index
+    name_of = {entity_id: entity_vals[2] for entity_id, entity_vals in entities.items()}
+    start_of = {entity_vals[2]: int(entity_vals[0]) for entity_vals in entities.values()}
 
     logging.debug(f"Entities: {entities}")
     logging.debug(f"Events: {events_list}")
@@ -77,13 +97,13 @@ def from_annotation_file_to_records(annotation_file: List[str], context: str) ->
     records = []
     for event in events_list:
         try:
-            value = entities[event['Value']][2]
-            temp = entities[event['temp']][2]
-            spec = entities[event['spec']][2]
-            spec_synonyms = get_synonyms(spec, synonyms_list)
-            cem = entities[event['cem']][2]
-            cem_synonyms = get_synonyms(cem, synonyms_list)
-            start_indices_for_record = {entry: int(start_indices[entry]) for entry in [value, temp] + spec_synonyms + cem_synonyms}
+            value = name_of[event['Value']]
+            temp = name_of[event['temp']]
+            spec = name_of[event['spec']]
+            spec_synonyms = get_synonyms(spec, synonyms_index)
+            cem = name_of[event['cem']]
+            cem_synonyms = get_synonyms(cem, synonyms_index)
+            start_indices_for_record = {entry: start_of[entry] for entry in (value, temp, *spec_synonyms, *cem_synonyms)}
             
             record = BRAT_record(value, spec_synonyms, cem_synonyms, temp, context, start_indices_for_record)
             records.append(record)
@@ -94,60 +114,81 @@ def from_annotation_file_to_records(annotation_file: List[str], context: str) ->
 
     return records
 
+def process_annotation_file(annotation_file_name: str, source: str, version: str, threshold: float) -> Optional[Dict]:
+    """Convert one BRAT annotation file (and its context) to a SQuAD-like entry, or None if it has no records."""
+    # seeded per file, so the output does not depend on which worker process handles which file
+    rng = random.Random(f"42-{annotation_file_name}")  # for reproducibility
+
+    annotation_file_path = os.path.join(source, annotation_file_name)
+    logging.info(f"Processing file: {os.path.basename(annotation_file_path)}")
+
+    try:
+        with open(annotation_file_path, "r") as f:
+            # split on newlines only, as iterating over the file did (str.splitlines also splits on e.g. \x0c or U+2028)
+            annotation_file = io.StringIO(f.read().translate(DASH_TRANSLATION_TABLE)).readlines()
+
+        context_filename = annotation_file_path.replace(".ann", ".txt")
+        with open(context_filename, "r") as f:
+            context = f.read()
+
+        records = from_annotation_file_to_records(annotation_file, context)
+        
+        if not records:
+            logging.warning(f"No records found in {annotation_file_name}")
+            return None
+
+        entry_dict = {'title': annotation_file_name, 'paragraphs': [{'context': context, 'qas': []}]}
+        qas = entry_dict['paragraphs'][0]['qas']
+        # ids are unique across the dataset: annotation file name + position of the question in the paragraph
+        id_prefix = os.path.splitext(annotation_file_name)[0]
+        
+        for record in records:
+            questions_set, answers_set, answerstarts_set = record.to_QA_for_test_dataset(rng)
+
+            for question, answers, answerstarts in zip(questions_set, answers_set, answerstarts_set):
+                qa_id = f"{id_prefix}-{len(qas) + 1:03d}"
+                answers_entry = [{'text': answer, 'answer_start': start} for answer, start in zip(answers, answerstarts)]
+                qas.append({'question': question, 'id': qa_id, 'answers': answers_entry})
+
+            if version == 'v2':
+                try:
+                    unanswerable_questions, _, _ = record.to_unanswerable_QA_for_test_dataset(context, rng)
+                    for question in (uq for uq in unanswerable_questions if rng.random() <= threshold):
+                        qa_id = f"{id_prefix}-{len(qas) + 1:03d}"
+                        qas.append({'question': question, 'id': qa_id, 'answers': [{'text': "", 'answer_start': -1}]})
+                except Exception as e:
+                    logging.error(f"Error generating unanswerable questions for {record.specifier} in {annotation_file_name}: {e}")
+
+        return entry_dict
+
+    except Exception as e:
+        logging.error(f"Error processing file {annotation_file_name}: {e}")
+        return None
+
 def main():
     setup_logging()
     args = parse_arguments()
 
-    random.seed(42)  # for reproducibility
     QA_test_dataset = {"data": [], "version": args.version}
 
-    pattern = r'[–−—―]'
-
-    for annotation_file_name in sorted([f for f in os.listdir(args.source) if f.endswith(".ann")]):
-        annotation_file_path = os.path.join(args.source, annotation_file_name)
-        logging.info(f"Processing file: {os.path.basename(annotation_file_path)}")
-
-        try:
-            with open(annotation_file_path, "r") as f:
-                annotation_file = [re.sub(pattern, '-', line) for line in f]
-
-            context_filename = annotation_file_path.replace(".ann", ".txt")
-            with open(context_filename, "r") as f:
-                context = f.read()
-
-            records = from_annotation_file_to_records(annotation_file, context)
-            
-            if not records:
-                logging.warning(f"No records found in {annotation_file_name}")
-                continue
-
-            entry_dict = {'title': annotation_file_name, 'paragraphs': [{'context': context, 'qas': []}]}
-            
-            for record in records:
-                questions_set, answers_set, answerstarts_set = record.to_QA_for_test_dataset()
-
-                for question, answers, answerstarts in zip(questions_set, answers_set, answerstarts_set):
-                    uuid_ = generate_unique_id([q['id'] for q in entry_dict['paragraphs'][0]['qas']])
-                    answers_entry = [{'text': answer, 'answer_start': start} for answer, start in zip(answers, answerstarts)]
-                    entry_dict['paragraphs'][0]['qas'].append({'question': question, 'id': uuid_, 'answers': answers_entry})
-
-                if args.version == 'v2':
-                    try:
-                        unanswerable_questions, _, _ = record.to_unanswerable_QA_for_test_dataset(context)
-                        for question in (uq for uq in unanswerable_questions if random.random() <= args.threshold):
-                            uuid_ = generate_unique_id([q['id'] for q in entry_dict['paragraphs'][0]['qas']])
-                            entry_dict['paragraphs'][0]['qas'].append({'question': question, 'id': uuid_, 'answers': [{'text': "", 'answer_start': -1}]})
-                    except Exception as e:
-                        logging.error(f"Error generating unanswerable questions for {record.specifier} in {annotation_file_name}: {e}")
-
-            QA_test_dataset["data"].append(entry_dict)
-
-        except Exception as e:
-            logging.error(f"Error processing file {annotation_file_name}: {e}")
+    # files are independent of each other, so they are processed in parallel; map() keeps them in sorted order
+    annotation_file_names = sorted([f for f in os.listdir(args.source) if f.endswith(".ann")])
+    process_one = partial(process_annotation_file, source=args.source, version=args.version, threshold=args.threshold)
+    # each file takes well under a millisecond, so they are sent to the workers in batches (as multiprocessing.Pool.map does)
+    workers = args.workers or os.cpu_count() or 1
+    chunksize = max(1, len(annotation_file_names) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers, initializer=setup_logging) as executor:
+        for entry_dict in executor.map(process_one, annotation_file_names, chunksize=chunksize):
+            if entry_dict is not None:
+                QA_test_dataset["data"].append(entry_dict)
 
     # Calculate and log statistics
-    total_questions = sum(len(entry['paragraphs'][0]['qas']) for entry in QA_test_dataset['data'])
-    answerable_questions = sum(len([q for q in entry['paragraphs'][0]['qas'] if q['answers'][0]['text']]) for entry in QA_test_dataset['data'])
+    total_questions = answerable_questions = 0
+    for entry in QA_test_dataset['data']:
+        for q in entry['paragraphs'][0]['qas']:
+            total_questions += 1
+            if q['answers'][0]['text']:
+                answerable_questions += 1
     unanswerable_questions = total_questions - answerable_questions
 
     logging.info(f"Number of contexts: {len(QA_test_dataset['data'])}")
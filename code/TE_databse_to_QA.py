@@ -1,13 +1,15 @@
 import pandas as pd
-import json
 from tqdm import tqdm
 import numpy as np
 import os
+import sys
 import random
 import argparse
 import logging
+from functools import lru_cache
 
-from utils import recover_leading_spaces, remove_leading_and_trailing_spaces, load_json, save_json, find_key_by_value, generate_unique_id
+from utils import recover_leading_spaces, remove_leading_and_trailing_spaces, load_json, save_json, build_reverse_index
+from dataset_writer import JSONDatasetWriter
 
 """
 This script converts a thermoelectric database into a question-answering dataset.
@@ -37,48 +39,47 @@ candidates_for_trailing_space_removal = r"~/-<>%:×"
 
 random.seed(42) # for reproducibility
 
+# the answer helpers below work column-wise on the whole database (or any subset of its rows)
+
 def clean_value_and_units(units_if_any):
-    units_if_any = units_if_any[:-1] if units_if_any.endswith("(") else units_if_any
-    return units_if_any.strip()
+    return units_if_any.str.removesuffix("(").str.strip()
 
 
-def resolve_ZT_dashes(record):
-    return f" {record['raw_units']}" if record['raw_units'] != "-" else ""
+def resolve_ZT_dashes(records):
+    return (" " + records['raw_units']).where(records['raw_units'] != "-", "")
 
 
-def get_material_answer(record):
-    return (record['compound_name']).strip()
+def get_material_answer(records):
+    return records['compound_name'].str.strip()
 
 
-def get_value_and_units_answer(record):
+def get_value_and_units_answer(records):
     # NB leading space if there are units
-    units_if_any = resolve_ZT_dashes(record)
+    units_if_any = resolve_ZT_dashes(records)
     units_if_any = clean_value_and_units(units_if_any)
-    return f"{record['raw_value'].strip()} {units_if_any}"
+    return records['raw_value'].str.strip() + " " + units_if_any
 
 
-def get_temperature_answer(record):
-    if record['raw_temp_value'] != "-":
-        temperature_answer = f"{record['raw_temp_value'].strip()} {record['raw_temp_units'].strip()}"
-    else:
-        temperature_answer = f"{record['raw_room_temperature'].strip()}"
-    return temperature_answer[:-1] if temperature_answer.endswith("(") else temperature_answer
+def get_temperature_answer(records):
+    temperature_answer = (records['raw_temp_value'].str.strip() + " " + records['raw_temp_units'].str.strip()).where(
+        records['raw_temp_value'] != "-", records['raw_room_temperature'].str.strip())
+    return temperature_answer.str.removesuffix("(")
 
 
-def pick_one_from_synonyms(synonyms):
+def pick_one_from_synonyms(synonyms, rng=random):
     if not isinstance(synonyms, list):
         return synonyms
     
     # return the longest entry (but not more than 3 words) that doesn't start with 'room' or ends with ')'
     filtered_synonyms = [s for s in synonyms if not s.startswith('room') and not s.endswith(')') and not (len(s.split()) > 3)]
     if not filtered_synonyms:
-        return random.choice(synonyms)
+        return rng.choice(synonyms)
     
     return max(filtered_synonyms, key=len)
 
 
-def find_all_possible_answer_starts(context, answer):
-    start = 0
+def find_all_possible_answer_starts(context, answer, start=0):
+    # str.find beats a (cached) compiled regex for literal answers, even when looping over overlapping occurrences
     answer_starts = []
 
     while True:
@@ -91,34 +92,63 @@ def find_all_possible_answer_starts(context, answer):
     return answer_starts
 
 
-def df_record_to_QAs(record):
+def iter_processed_answers(answer):
+    """
+    Yield the variations of the answer (e.g. with leading spaces) to look for in the context, without repeats.
+
+    They are produced lazily, so the space-removal variations are only worked out if no
+    space-addition variation has been found in the context already.
+    """
+    seen = set()
+    for processed_answer in recover_leading_spaces(answer, candidates_for_leading_space_addition):
+        if processed_answer not in seen:
+            seen.add(processed_answer)
+            yield processed_answer
+    for processed_answer in remove_leading_and_trailing_spaces(answer,
+                                candidates_for_leading_space_addition,
+                                candidates_for_leading_space_removal):
+        if processed_answer not in seen:
+            seen.add(processed_answer)
+            yield processed_answer
+
+
+def add_QA_columns(tedb):
     """
-    Convert a database record to question-answer pairs.
+    Add the question and answer columns to the database, for all records at once.
 
     Args:
-        record (pd.Series): A row from the thermoelectric database.
+        tedb (pd.DataFrame): The thermoelectric database.
 
     Returns:
-        tuple: A tuple containing two lists - questions and answers.
+        pd.DataFrame: The database with the A1-A4 answer and Q2-Q4 question columns added.
+
+    Raises:
+        ValueError: If a question or answer would be built from a missing (NaN or empty) value.
     """
 
     # every record is a single occurance, no synonyms
 
-    units_if_any = resolve_ZT_dashes(record)
-    units_if_any = clean_value_and_units(units_if_any)
-
-    A1_valunits = get_value_and_units_answer(record)
-    Q2_temperature = f"At what temperature was the value of {A1_valunits} recorded?"
-    A2_temperature = get_temperature_answer(record)
-    Q3_specifier = f"Which property was recorded to be {A1_valunits} at {A2_temperature}?"
-    A3_selected_specifier = record['specifier']
-    Q4_material = f"Which material was recorded to have a {A3_selected_specifier} of {A1_valunits} at {A2_temperature}?"
-    A4_material = get_material_answer(record)
-
-    questions = [Q2_temperature, Q3_specifier, Q4_material]
-    answers = [A2_temperature, A3_selected_specifier, A4_material]
-
-    return questions, answers
+    tedb['A1_valunits'] = get_value_and_units_answer(tedb)
+    tedb['Q2_temperature'] = "At what temperature was the value of " + tedb['A1_valunits'] + " recorded?"
+    tedb['A2_temperature'] = get_temperature_answer(tedb)
+    tedb['Q3_specifier'] = "Which property was recorded to be " + tedb['A1_valunits'] + " at " + tedb['A2_temperature'] + "?"
+    tedb['A3_selected_specifier'] = tedb['specifier']
+    tedb['Q4_material'] = ("Which material was recorded to have a " + tedb['A3_selected_specifier'] + " of "
+                           + tedb['A1_valunits'] + " at " + tedb['A2_temperature'] + "?")
+    tedb['A4_material'] = get_material_answer(tedb)
+
+    # the column-wise string operations carry a missing value through instead of failing on it,
+    # so records without a value, temperature, specifier or material are rejected here (units are optional)
+    QA_columns = ['A1_valunits', 'Q2_temperature', 'A2_temperature', 'Q3_specifier', 'A3_selected_specifier', 'Q4_material', 'A4_material']
+    missing_values = (tedb[QA_columns].isna().any(axis=1)
+                      | (tedb[['A2_temperature', 'A3_selected_specifier', 'A4_material']] == "").any(axis=1)
+                      | (tedb['raw_value'].str.strip() == ""))
+    rows_with_missing_values = tedb.index[missing_values]
+    if len(rows_with_missing_values):
+        raise ValueError(f"Missing values in the records at rows {list(rows_with_missing_values)}, "
+                         f"cannot build their questions and answers")
+
+    return tedb
         
 
 # specifier (property) -> compound_name -> raw_value + raw_units -> temperature
@@ -132,9 +162,39 @@ value_and_units_set = load_json(os.path.join(provisions_folder, "value_and_units
 value_and_units_set_per_model = load_json(os.path.join(provisions_folder, "value_and_units_set_per_model.json"))
 temperatures_not_room = load_json(os.path.join(provisions_folder, "temperatures_not_room.json"))
 
+# reverse indexes (datapoint -> model), built once instead of scanning the models per lookup;
+# as before, the first model listing a datapoint wins
+model_from_specifier_index = build_reverse_index({m: specifiers_set_per_model[m] for m in models_set})
+model_from_value_and_units_index = build_reverse_index(value_and_units_set_per_model)
+
+
+@lru_cache(maxsize=None)
+def get_other_models(model):
+    return tuple(m for m in models_set if m != model)
+
+
+MAX_UNFINDABLE_ATTEMPTS = 8
+
+
+def pick_absent_from_context(pool, context, rng=random):
+    """
+    Pick a candidate from the pool that does not appear in the context.
+
+    Up to MAX_UNFINDABLE_ATTEMPTS random candidates are drawn, one at a time since the first one
+    almost always succeeds; if they all appear in the context, a random one from the pool is
+    returned regardless. Candidates are drawn with rng (a random.Random, or the random module
+    itself by default).
+    """
+    for _ in range(MAX_UNFINDABLE_ATTEMPTS):
+        candidate = rng.choice(pool)
+        if candidate not in context:
+            return candidate
+    return rng.choice(pool)
+
+
 # randomly choose a different specifier, compound, value and units, or temperature kind
-# if the chosen one is already in the context, call the function Recursively to choose another one
-def get_unfindable_datapoint(datapoint, datapoint_kind, context):
+# if the chosen one is already in the context, try another one (a bounded number of times)
+def get_unfindable_datapoint(datapoint, datapoint_kind, context, rng=random):
     """
     Generate an unfindable datapoint for creating unanswerable questions.
 
@@ -142,6 +202,7 @@ def get_unfindable_datapoint(datapoint, datapoint_kind, context):
         datapoint (str): The original datapoint.
         datapoint_kind (str): The type of datapoint ('specifier', 'compound', 'value_and_units', or 'temperature').
         context (str): The context in which the datapoint should not be found.
+        rng (random.Random, optional): The random number generator to use; the random module by default.
 
     Returns:
         str: An unfindable datapoint of the specified kind.
@@ -149,72 +210,47 @@ def get_unfindable_datapoint(datapoint, datapoint_kind, context):
 
     # get a specifier from a different model (because a specifier from the same model should still have an answer?)
     if datapoint_kind == "specifier":
-        try:
-            model_from_specifier = [model for model in models_set if datapoint.strip() in specifiers_set_per_model[model]][0]
-        except IndexError:
+        model_from_specifier = model_from_specifier_index.get(datapoint.strip())
+        if model_from_specifier is None:
             print(f"Specifier >{datapoint}< not found in any model's specifiers. (check specifiers_set_per_model)")
             return "None"
-        different_model = random.choice([m for m in models_set if m != model_from_specifier])
-        different_specifier = random.choice(specifiers_set_per_model[different_model])
-        if different_specifier in context:
-            # print(f"Found specifier >{different_specifier}< (changed from {datapoint}) in '{context}' (should not be there)")
-            get_unfindable_datapoint(datapoint, datapoint_kind, context)
-        else:
-            return different_specifier
+        different_model = rng.choice(get_other_models(model_from_specifier))
+        return pick_absent_from_context(specifiers_set_per_model[different_model], context, rng)
         
     if datapoint_kind == "compound":
-        different_compound = random.choice(compounds_set)
-        if different_compound in context:
-            # print(f"Found compound >{different_compound}< (changed from {datapoint}) in '{context}' (should not be there)")
-            get_unfindable_datapoint(datapoint, datapoint_kind, context)
-        else:
-            return different_compound
+        return pick_absent_from_context(compounds_set, context, rng)
         
     # get value and units from the same model (unlikely to coincide with the original one)
     if datapoint_kind == "value_and_units":
-        model_from_value_and_units = find_key_by_value(datapoint, value_and_units_set_per_model)
+        model_from_value_and_units = model_from_value_and_units_index.get(datapoint)
         if not model_from_value_and_units:
             print(f"Value and units [{datapoint}] not found in any model's raw_values. Pick randomly.")
-            model_from_value_and_units = random.choice(models_set)
-        
-        different_value_and_units = random.choice(value_and_units_set_per_model[model_from_value_and_units])
-        if different_value_and_units in context:
-            # print(f"Found valunits >{different_value_and_units}< (changed from {datapoint}) in '{context}' (should not be there)")
-            # run again until we get a different one. Can get stuck in infinite loop?
-            get_unfindable_datapoint(datapoint, datapoint_kind, context)
-        else:
-            return different_value_and_units
+            model_from_value_and_units = rng.choice(models_set)
+        return pick_absent_from_context(value_and_units_set_per_model[model_from_value_and_units], context, rng)
         
     if datapoint_kind == "temperature":
         # ignore the room temperature cases because they are too frequent (and it's hard to pick out their synonyms)
-        different_temperature = random.choice(temperatures_not_room)
-        if different_temperature in context:
-            # print(f"Found temperature >{different_temperature}< (changed from {datapoint}) in '{context}' (should not be there)")
-            get_unfindable_datapoint(datapoint, datapoint_kind, context)
-        else:
-            return different_temperature
+        return pick_absent_from_context(temperatures_not_room, context, rng)
     
 
 # using a choice between which single datapoint to sabotage. Could also do it with possibility for multiple ones
-def df_record_to_unanswerable_QAs(record):
+def df_record_to_unanswerable_QAs(context, A1_valunits, A2_temperature, A3_selected_specifier):
     """
     Generate unanswerable questions from a database record.
 
     Args:
-        record (pd.Series): A row from the thermoelectric database.
+        context (str): The context of the record.
+        A1_valunits (str): The value and units answer of the record.
+        A2_temperature (str): The temperature answer of the record.
+        A3_selected_specifier (str): The specifier answer of the record.
 
     Returns:
         tuple: A tuple containing two lists - unanswerable questions and empty answers.
     """
-    context = record['context']
-    
     # returns 3 unanswerable QAs per record
     unanswerable_questions = []
 
-    # actual answers
-    A1_valunits = get_value_and_units_answer(record)
-    A2_temperature = get_temperature_answer(record)
-    A3_selected_specifier = record['specifier']
+    # actual answers are given (see add_QA_columns)
     # material answer not needed, just remains unanswered
 
     # Q2: unfindable value and units -> looking for temperature
@@ -225,7 +261,7 @@ def df_record_to_unanswerable_QAs(record):
 
     # Q3: unfindable value and units, or temperature -> looking for specifier
     # choose to sabotage valunits or temperature
-    sabotage_choice = random.choice([1,2])
+    sabotage_choice = random.randrange(1, 3)
     if sabotage_choice == 1:
         unfindable_valunits = get_unfindable_datapoint(A1_valunits, "value_and_units", context)
         unanswerable_Q3_specifier = f"Which property was recorded to be {unfindable_valunits} at {A2_temperature}?"
@@ -237,7 +273,7 @@ def df_record_to_unanswerable_QAs(record):
 
     # Q4: unfindable value and units, temperature, or specifier -> looking for material
     # choose to sabotage valunits, temperature, or specifier
-    sabotage_choice = random.choice([1,2,3])
+    sabotage_choice = random.randrange(1, 4)
     if sabotage_choice == 1:
         unfindable_valunits = get_unfindable_datapoint(A1_valunits, "value_and_units", context)
         unanswerable_Q4_material = f"Which material was recorded to have a {A3_selected_specifier} of {unfindable_valunits} at {A2_temperature}?"
@@ -250,7 +286,7 @@ def df_record_to_unanswerable_QAs(record):
     unanswerable_questions.append(unanswerable_Q4_material)
     # print(f"unanswerable_Q4_material: {unanswerable_Q4_material}")
 
-    no_answers = ["" for _ in unanswerable_questions]
+    no_answers = [""] * len(unanswerable_questions)
     return unanswerable_questions, no_answers
 
 
@@ -269,10 +305,9 @@ if __name__ == "__main__":
     version = args.version
     percentage_of_unanswerable_questions = args.unanswerable_percentage
     
-    QA_Dataset = {"data": [], "version": version}
     count_ = 0
     answers_starts_not_found = []
-    answers_starts_not_found_per_property = {p: [] for p in models_set}
+    models_of_answers_not_found = []  # in step with answers_starts_not_found, grouped per property at the end
     number_of_answerable_questions = 0
     number_of_unanswerable_questions = 0
     number_of_multi_index_answers = 0
@@ -281,7 +316,8 @@ if __name__ == "__main__":
     logging.info(f"Number of unique value and units: {len(value_and_units_set)}")  
 
     try:
-        tedb = pd.read_csv(args.input_csv)
+        # empty cells are kept as empty strings (not NaN), as the answers and questions are built from them
+        tedb = pd.read_csv(args.input_csv, keep_default_na=False)
     except FileNotFoundError:
         logging.error(f"Input CSV file not found: {args.input_csv}")
         raise
@@ -289,96 +325,118 @@ if __name__ == "__main__":
         logging.error(f"Input CSV file is empty: {args.input_csv}")
         raise
                         
-    for i in tqdm(range(len(tedb))):
-        record = tedb.iloc[i]
-        # this is not true. there exist duplicates. should I get a hash from the context?
-        entry_dict = {'title': f'{"sentence" if version == "v1" else "paragraph"}{f"{i+1}".zfill(3)}',
-                      'doi': record['doi'].replace('-', '/', 1).replace('.txt', '').replace('.html', '').replace('.xml', ''),
-                      'paragraphs': []}
-        
-        # NB I only have one paragraph per entry (title)
-        paragraphs = [{'context': "", 'qas': []}]
-        
-        context = record['context']
+    tedb = add_QA_columns(tedb)
+    tedb['doi'] = (tedb['doi'].str.replace('-', '/', n=1, regex=False).str.replace('.txt', '', regex=False)
+                   .str.replace('.html', '', regex=False).str.replace('.xml', '', regex=False))
+    QA_columns = ['doi', 'context', 'model', 'Q2_temperature', 'Q3_specifier', 'Q4_material',
+                  'A1_valunits', 'A2_temperature', 'A3_selected_specifier', 'A4_material']
 
-        # answerable questions:
-        questions, answers = df_record_to_QAs(record)
+    # saving: asked up front, since the dataset is written to the file entry by entry
+    save_name = args.output_json
 
-        for question, answer in zip(questions, answers):
+    if os.path.exists(save_name):
+        logging.warning(f"File {save_name} already exists")
 
-            # processed answers contains possible variations of the answer (e.g. with leading spaces)
-            # but only one could be found in the context
-            processed_answers = recover_leading_spaces(answer, candidates_for_leading_space_addition)
-            processed_answers.extend(remove_leading_and_trailing_spaces(answer,
-                                        candidates_for_leading_space_addition,
-                                        candidates_for_leading_space_removal))
+        response = input("Do you want to overwrite the file? (y/n): ")
+
+        if response.lower() != "y":
+            logging.info("File not saved")
+            sys.exit()
+
+    with JSONDatasetWriter(save_name, version) as dataset_writer:
+        for i, (doi, context, model, Q2_temperature, Q3_specifier, Q4_material,
+                A1_valunits, A2_temperature, A3_selected_specifier, A4_material) in enumerate(
+                    tqdm(tedb[QA_columns].itertuples(index=False, name=None), total=len(tedb))):
+            # this is not true. there exist duplicates. should I get a hash from the context?
+            entry_dict = {'title': f'{"sentence" if version == "v1" else "paragraph"}{f"{i+1}".zfill(3)}',
+                          'doi': doi,
+                          'paragraphs': []}
             
-            found_answer = False
-
-            for processed_answer in processed_answers:
-                answer_start = context.find(processed_answer)
-                if answer_start != -1:
-                    # if one is found, try and find all the possible answer starts. Not optimal but the code was already set up for it
-                    answer_start_options = find_all_possible_answer_starts(context, processed_answer)
-                    if len(answer_start_options) > 1:
-                        number_of_multi_index_answers += 1
-                        # print(f"Multiple answer starts found for question: {question} with answer: {answer}")
+            # NB I only have one paragraph per entry (title)
+            paragraphs = [{'context': "", 'qas': []}]
+            qas = paragraphs[0]['qas']
+
+            # answerable questions:
+            questions = [Q2_temperature, Q3_specifier, Q4_material]
+            answers = [A2_temperature, A3_selected_specifier, A4_material]
+
+            for question, answer in zip(questions, answers):
+
+                # processed answers are possible variations of the answer (e.g. with leading spaces)
+                # but only one could be found in the context
+                found_answer = False
+
+                for processed_answer in iter_processed_answers(answer):
+                    answer_start = context.find(processed_answer)
+                    if answer_start != -1:
+                        # if one is found, try and find all the possible answer starts, carrying on from the first one
+                        answer_start_options = find_all_possible_answer_starts(context, processed_answer, answer_start)
+                        if len(answer_start_options) > 1:
+                            number_of_multi_index_answers += 1
+                            # print(f"Multiple answer starts found for question: {question} with answer: {answer}")
+                            # print(f"Context: {context}")
+                            # print(f"Answer starts: {answer_start_options}")
+                            # print()
+                            answers_for_data = []
+                            for answer_start_option in answer_start_options:
+                                answers_for_data.append({'text': processed_answer, 'answer_start': answer_start_option})
+                        else:
+                            answers_for_data = [{'text': processed_answer, 'answer_start': answer_start}]
+
+                        # ids are unique across the dataset: record number + position of the question in the paragraph
+                        qa_id = f"{i+1:05d}-{len(qas) + 1:03d}"
+                        qas.append({'question': question, 'id': qa_id,
+                                    'answers': answers_for_data,
+                                    'is_impossible': False})
+                        count_ += 1
+                        found_answer = True
+                        number_of_answerable_questions += 1
+                        break
+
+                if not found_answer:
+                    answers_starts_not_found.append([question, answer, context])
+                    models_of_answers_not_found.append(model)
+
+                    # if record['model'] == 'ZT':
+                        # ZT has the most problems, so print the failed cases
+                        # print(f"Answer not found for question: {question} with answer: {answer}")
                         # print(f"Context: {context}")
-                        # print(f"Answer starts: {answer_start_options}")
                         # print()
-                        answers_for_data = []
-                        for answer_start_option in answer_start_options:
-                            answers_for_data.append({'text': processed_answer, 'answer_start': answer_start_option})
-                    else:
-                        answers_for_data = [{'text': processed_answer, 'answer_start': answer_start}]
-
-                    uuid_ = generate_unique_id([q['id'] for q in paragraphs[0]['qas']])
-                    paragraphs[0]['qas'].append({'question': question, 'id': f"{uuid_}",
-                                                'answers': answers_for_data,
-                                                'is_impossible': False})
+                        
+
+            # unanswerable questions (subset):
+            if version == "v2":
+                unanswerable_questions, no_answers = df_record_to_unanswerable_QAs(context, A1_valunits, A2_temperature, A3_selected_specifier)
+                # random subset of unanswerable questions based on percentage (typically 50%)
+                # Dynamicaly the percentage. Because unanswerable questions never fail (so always 3 per records available to choose from)
+                # while answerable questions can fail if the answer_start isn't found within the context (so always fewer than 3. Currently 2.74)
+                adjusted_percentage = percentage_of_unanswerable_questions * (number_of_answerable_questions - len(answers_starts_not_found)) / number_of_answerable_questions
+                # manual adjustment
+                # adjusted_percentage = 2.74 / 6
+                random_subset_of_unanswerable_questions = (uq for uq in unanswerable_questions if random.random() <= adjusted_percentage)
+
+                for question in random_subset_of_unanswerable_questions:
+                    qa_id = f"{i+1:05d}-{len(qas) + 1:03d}"
+                    qas.append({'question': question, 'id': qa_id,
+                                'answers': [{'text': [], 'answer_start': []}],
+                                'is_impossible': True})
+                    number_of_unanswerable_questions += 1
                     count_ += 1
-                    found_answer = True
-                    number_of_answerable_questions += 1
-                    break
-
-            if not found_answer:
-                answers_starts_not_found.append([question, answer, context])
-                answers_starts_not_found_per_property[record['model']].append([question, answer, context])
-
-                # if record['model'] == 'ZT':
-                    # ZT has the most problems, so print the failed cases
-                    # print(f"Answer not found for question: {question} with answer: {answer}")
-                    # print(f"Context: {context}")
-                    # print()
-                    
-
-        # unanswerable questions (subset):
-        if version == "v2":
-            unanswerable_questions, no_answers = df_record_to_unanswerable_QAs(record)
-            # random subset of unanswerable questions based on percentage (typically 50%)
-            # Dynamicaly the percentage. Because unanswerable questions never fail (so always 3 per records available to choose from)
-            # while answerable questions can fail if the answer_start isn't found within the context (so always fewer than 3. Currently 2.74)
-            adjusted_percentage = percentage_of_unanswerable_questions * (number_of_answerable_questions - len(answers_starts_not_found)) / number_of_answerable_questions
-            # manual adjustment
-            # adjusted_percentage = 2.74 / 6
-            random_subset_of_unanswerable_questions = (uq for uq in unanswerable_questions if random.random() <= adjusted_percentage)
-
-            for question in random_subset_of_unanswerable_questions:
-                uuid_ = generate_unique_id([q['id'] for q in paragraphs[0]['qas']])
-                paragraphs[0]['qas'].append({'question': question, 'id': f"{uuid_}",
-                                             'answers': [{'text': [], 'answer_start': []}],
-                                             'is_impossible': True})
-                number_of_unanswerable_questions += 1
-                count_ += 1
-
-        # add to dataset
-        paragraphs[0]['context'] = context
-        entry_dict['paragraphs'].extend(paragraphs)
-        QA_Dataset['data'].append(entry_dict)
+
+            # add to dataset
+            paragraphs[0]['context'] = context
+            entry_dict['paragraphs'].extend(paragraphs)
+            if i == 0:
+                # example entry
+                logging.debug(f"Example entry: {entry_dict}")
+            dataset_writer.write(entry_dict)
 
     # end of big loop ^
-    # example entry
-    logging.debug(f"Example entry: {QA_Dataset['data'][0]}")
+    answers_starts_not_found_per_property = {p: [] for p in models_set}
+    for model, answer_not_found in zip(models_of_answers_not_found, answers_starts_not_found):
+        answers_starts_not_found_per_property[model].append(answer_not_found)
+
+    logging.info(f"File saved: {save_name}")
     logging.info(f"Total number of questions: {count_}")
     logging.info(f"Failed answerable questions: {len(answers_starts_not_found)}. Percentage failed: {len(answers_starts_not_found)/number_of_answerable_questions*100.0:.2f}%")
     logging.info(f"Number of answerable questions: {number_of_answerable_questions}. Multiples of records: {number_of_answerable_questions/len(tedb):.2f}")
@@ -386,24 +444,5 @@ if __name__ == "__main__":
     logging.info("Answers not found per property: %s", {p: len(answers_starts_not_found_per_property[p]) for p in answers_starts_not_found_per_property})
     logging.info(f"Number of multi-index answers: {number_of_multi_index_answers}")
 
-    with open("not_found_answers_per_property.json", 'w') as f:
-        json.dump(answers_starts_not_found_per_property, f, indent=4)
-
-    # saving:
-    save_name = args.output_json
-
-    if not os.path.exists(save_name):
-        save_json(QA_Dataset, save_name)
-        logging.info(f"File saved: {save_name}")
-        save_json(answers_starts_not_found, "not_found_answers.json")
-    else:
-        logging.warning(f"File {save_name} already exists")
-
-        response = input("Do you want to overwrite the file? (y/n): ")
-
-        if response.lower() == "y":
-            save_json(QA_Dataset, save_name)
-            save_json(answers_starts_not_found, "not_found_answers.json")
-            logging.info("File overwritten")
-        else:
-            logging.info("File not saved")
\ No newline at end of file
+    save_json(answers_starts_not_found_per_property, "not_found_answers_per_property.json", indent=None)
+    save_json(answers_starts_not_found, "not_found_answers.json", indent=None)
\ No newline at end of file
@@ -1,13 +1,16 @@
 from TE_databse_to_QA import pick_one_from_synonyms, get_unfindable_datapoint
+from utils import DASH_TRANSLATION_TABLE
 import random
-import re
 
 class BRAT_record:
     """
     Class to represent a BRAT annotation record with fields for raw value, specifier, names, temperature, 
     and sentence. It supports methods for processing the record into QA format for the test dataset.
     """
-        
+
+    # no per-instance __dict__: records are created for every annotated event
+    __slots__ = ("raw_value_and_units", "specifier", "names", "any_temperature", "sentence", "start_indices_for_record")
+
     def __init__(self, raw_value, specifier, names, temperature, sentence, start_indices_for_record):
         """
         Initialize a BRAT_record instance.
@@ -20,17 +23,13 @@ class BRAT_record:
             sentence (str): The full sentence context of the record.
             start_indices_for_record (dict): A dictionary mapping record elements to their start indices in the text.
         """
-        self.pattern = r'[–−—―]'
-
-        self.equals_check_fields = "names raw_value_and_units any_temperature".split()
-
         assert isinstance(specifier, list), "specifier should be a list now"
         
-        self.raw_value_and_units = re.sub(self.pattern, '-', raw_value)
-        self.specifier = [re.sub(self.pattern, '-', s) for s in specifier]
-        self.names = [re.sub(self.pattern, '-', n) for n in names]  # main difference 1/2 to CDED_record
-        self.any_temperature = re.sub(self.pattern, '-', temperature)
-        self.sentence = re.sub(self.pattern, '-', sentence)
+        self.raw_value_and_units = raw_value.translate(DASH_TRANSLATION_TABLE)
+        self.specifier = [s.translate(DASH_TRANSLATION_TABLE) for s in specifier]
+        self.names = [n.translate(DASH_TRANSLATION_TABLE) for n in names]  # main difference 1/2 to CDED_record
+        self.any_temperature = temperature.translate(DASH_TRANSLATION_TABLE)
+        self.sentence = sentence.translate(DASH_TRANSLATION_TABLE)
 
         self.start_indices_for_record = start_indices_for_record  # main difference 2/2, specific to BRAT records
 
@@ -46,18 +45,23 @@ class BRAT_record:
         material_answer_starts = [self.start_indices_for_record[name] for name in self.names]
         return [[temperature_answer_start], specifier_answer_starts, material_answer_starts]
 
-    def process_valunits(self, raw_value_and_units):
+    @staticmethod
+    def process_valunits(raw_value_and_units):
 
-        return f"{raw_value_and_units.strip()}".replace("∼ ", "∼")
+        return raw_value_and_units.strip().replace("∼ ", "∼")
 
-    def process_temperature(self, any_temperature):
+    @staticmethod
+    def process_temperature(any_temperature):
 
-        return f"{any_temperature.strip()}".replace("∼ ", "∼")
+        return any_temperature.strip().replace("∼ ", "∼")
 
-    def to_QA_for_test_dataset(self):
+    def to_QA_for_test_dataset(self, rng=random):
         """
         Generate question-answer pairs for the test dataset.
 
+        Args:
+            rng (random.Random, optional): The random number generator to use; the random module by default.
+
         Returns:
             tuple: A tuple containing lists of questions, answers, and answer start indices.
         """
@@ -66,7 +70,7 @@ class BRAT_record:
         A2_temperature = self.process_temperature(self.any_temperature)
         Q3_specifier = f"Which property was recorded to be {A1_valunits} at {A2_temperature}?"
         A3_specifier_synonyms = self.specifier  # list of synonyms
-        A3_selected_specifier = pick_one_from_synonyms(A3_specifier_synonyms)
+        A3_selected_specifier = pick_one_from_synonyms(A3_specifier_synonyms, rng)
         Q4_material = f"Which material was recorded to have a {A3_selected_specifier} of {A1_valunits} at {A2_temperature}?"
         A4_material_synonyms = self.names  # list of synonyms
 
@@ -76,12 +80,13 @@ class BRAT_record:
 
         return questions, answers, answer_starts
 
-    def to_unanswerable_QA_for_test_dataset(self, context):
+    def to_unanswerable_QA_for_test_dataset(self, context, rng=random):
         """
         Generate unanswerable question-answer pairs for the test dataset.
 
         Args:
             context (str): The context in which to generate unanswerable questions.
+            rng (random.Random, optional): The random number generator to use; the random module by default.
 
         Returns:
             tuple: A tuple containing lists of unanswerable questions, empty answers, and -1 answer start indices.
@@ -91,40 +96,48 @@ class BRAT_record:
         A1_valunits = self.process_valunits(self.raw_value_and_units)
         A2_temperature = self.process_temperature(self.any_temperature)
         A3_specifier_synonyms = self.specifier
-        A3_selected_specifier = pick_one_from_synonyms(A3_specifier_synonyms)
+        A3_selected_specifier = pick_one_from_synonyms(A3_specifier_synonyms, rng)
 
         # Q2: unfindable value and units -> looking for temperature
-        unfindable_valunits = get_unfindable_datapoint(A1_valunits, "value_and_units", context)
+        unfindable_valunits = get_unfindable_datapoint(A1_valunits, "value_and_units", context, rng)
         unanswerable_Q2_temperature = f"At what temperature was the value of {unfindable_valunits} recorded?"
         unanswerable_questions.append(unanswerable_Q2_temperature)
 
         # Q3: unfindable value and units, or temperature -> looking for specifier
-        sabotage_choice = random.choice([1,2])
+        sabotage_choice = rng.randrange(1, 3)
         if sabotage_choice == 1:
-            unfindable_valunits = get_unfindable_datapoint(A1_valunits, "value_and_units", context)
+            unfindable_valunits = get_unfindable_datapoint(A1_valunits, "value_and_units", context, rng)
             unanswerable_Q3_specifier = f"Which property was recorded to be {unfindable_valunits} at {A2_temperature}?"
         else:
-            unfindable_temperature = get_unfindable_datapoint(A2_temperature, "temperature", context)
+            unfindable_temperature = get_unfindable_datapoint(A2_temperature, "temperature", context, rng)
             unanswerable_Q3_specifier = f"Which property was recorded to be {A1_valunits} at {unfindable_temperature}?"
         unanswerable_questions.append(unanswerable_Q3_specifier)
 
         # Q4: unfindable value and units, temperature, or specifier -> looking for material
-        sabotage_choice = random.choice([1,2,3])
+        sabotage_choice = rng.randrange(1, 4)
         if sabotage_choice == 1:
-            unfindable_valunits = get_unfindable_datapoint(A1_valunits, "value_and_units", context)
+            unfindable_valunits = get_unfindable_datapoint(A1_valunits, "value_and_units", context, rng)
             unanswerable_Q4_material = f"Which material was recorded to have a {A3_selected_specifier} of {unfindable_valunits} at {A2_temperature}?"
         elif sabotage_choice == 2:
-            unfindable_temperature = get_unfindable_datapoint(A2_temperature, "temperature", context)
+            unfindable_temperature = get_unfindable_datapoint(A2_temperature, "temperature", context, rng)
             unanswerable_Q4_material = f"Which material was recorded to have a {A3_selected_specifier} of {A1_valunits} at {unfindable_temperature}?"
         else:
-            unfindable_specifier = get_unfindable_datapoint(A3_selected_specifier, "specifier", context)
+            unfindable_specifier = get_unfindable_datapoint(A3_selected_specifier, "specifier", context, rng)
             unanswerable_Q4_material = f"Which material was recorded to have a {unfindable_specifier} of {A1_valunits} at {A2_temperature}?"
         unanswerable_questions.append(unanswerable_Q4_material)
 
-        no_answers = ["" for _ in unanswerable_questions]
-        no_answerstarts = [-1 for _ in unanswerable_questions]
+        no_answers = [""] * len(unanswerable_questions)
+        no_answerstarts = [-1] * len(unanswerable_questions)
         return unanswerable_questions, no_answers, no_answerstarts
 
     def __eq__(self, other):
 
-        return all([getattr(self, field) == getattr(other, field) for field in self.equals_check_fields])
\ No newline at end of file
+        if not isinstance(other, BRAT_record):
+            return NotImplemented
+        return (self.names == other.names
+                and self.raw_value_and_units == other.raw_value_and_units
+                and self.any_temperature == other.any_temperature)
+
+    def __hash__(self):
+
+        return hash((tuple(self.names), self.raw_value_and_units, self.any_temperature))
\ No newline at end of file
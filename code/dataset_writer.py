@@ -0,0 +1,73 @@
+import os
+import json
+import logging
+from typing import Any, Dict, Optional
+
+# kept free of import-time side effects (unlike utils, which sets up logging and loads the metadata),
+# so that lightweight scripts can use it
+
+
+class JSONDatasetWriter:
+    """
+    Write a SQuAD-like {"data": [...], "version": ...} JSON file one entry at a time, so the whole
+    dataset never has to be held in memory. The output is laid out exactly as utils.save_json would write it.
+    The file is written under a temporary name and only moved into place once closed without error.
+
+    The "version" field is left out if it is None; any other top-level fields are written after it.
+
+    Usage:
+        with JSONDatasetWriter("dataset.json", "v2") as writer:
+            for entry in entries:
+                writer.write(entry)
+    """
+
+    def __init__(self, filepath: str, version: Optional[str], indent: Optional[int] = 4,
+                 other_fields: Optional[Dict[str, Any]] = None):
+        self.filepath = filepath
+        self.version = version
+        self.indent = indent
+        self.other_fields = other_fields or {}
+        self.number_of_entries = 0
+        self._partial_filepath = f"{filepath}.part"
+        self._file = None
+
+    def __enter__(self) -> "JSONDatasetWriter":
+        try:
+            self._file = open(self._partial_filepath, "w", encoding="utf-8")
+        except IOError as e:
+            logging.error(f"Error saving JSON file: {e}")
+            raise
+        self._file.write('{' + self._newline(1) + '"data": [')
+        return self
+
+    def _newline(self, level: int) -> str:
+        return "\n" + " " * (self.indent * level) if self.indent is not None else ""
+
+    def _dumps(self, value: Any, level: int) -> str:
+        value_json = json.dumps(value, ensure_ascii=False, indent=self.indent)
+        if self.indent is not None:
+            value_json = value_json.replace("\n", self._newline(level))
+        return value_json
+
+    def write(self, entry: Any) -> None:
+        """Append one entry to the "data" list."""
+        separator = ", " if self.indent is None else ","
+        self._file.write((separator if self.number_of_entries else "") + self._newline(2) + self._dumps(entry, 2))
+        self.number_of_entries += 1
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self._file.close()
+            os.remove(self._partial_filepath)
+            return
+        fields = {} if self.version is None else {"version": self.version}
+        fields.update(self.other_fields)
+        if self.number_of_entries:
+            self._file.write(self._newline(1))
+        self._file.write(']')
+        separator = ", " if self.indent is None else ","
+        for key, value in fields.items():
+            self._file.write(separator + self._newline(1) + json.dumps(key, ensure_ascii=False) + ': ' + self._dumps(value, 1))
+        self._file.write(self._newline(0) + '}')
+        self._file.close()
+        os.replace(self._partial_filepath, self.filepath)
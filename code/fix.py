@@ -1,36 +1,67 @@
 import json
 
+try:
+    import ijson
+except ImportError:  # optional; without it, the files are loaded whole
+    ijson = None
+
+from dataset_writer import JSONDatasetWriter
+
 # Paths to the two JSON files
 file1_path = "/Users/ody/Desktop/BERT/bert-pycharm/BERT_QA_from_TE_database/code/TE-CDE.json"  # File with DOI information
 file2_path = "/Users/ody/Desktop/BERT/bert-pycharm/BERT_QA_from_TE_database/TE_QA_train-dev_datasets/TE-CDE+SQuADv2_mixed/train_mixed.json"  # File that needs to have DOI added
 output_file2_path = file2_path.replace(".json", "_with_DOI.json")
 
-# Load the first file and create a mapping from title to DOI.
-with open(file1_path, 'r', encoding='utf-8') as f:
-    data1 = json.load(f)
 
+def iter_entries(path):
+    """Yield the entries of a SQuAD-like JSON file one at a time (streamed if ijson is available)."""
+    if ijson is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f).get("data", [])
+        return
+    with open(path, 'rb') as f:
+        yield from ijson.items(f, 'data.item', use_float=True)
+
+
+def get_top_level_fields(path):
+    """Get the top-level fields of a SQuAD-like JSON file other than "data" (streamed past the entries if ijson is available)."""
+    if ijson is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            return {key: value for key, value in json.load(f).items() if key != "data"}
+
+    fields = {}
+    key = builder = None
+    with open(path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == '' and event in ('map_key', 'end_map'):
+                # the previous top-level value is complete
+                if builder is not None:
+                    fields[key] = builder.value
+                key = value
+                builder = None if event == 'end_map' or key == "data" else ijson.ObjectBuilder()
+            elif builder is not None:
+                builder.event(event, value)
+    return fields
+
+
+# Go through the first file and create a mapping from title to DOI.
 doi_mapping = {}
-for entry in data1.get("data", []):
+for entry in iter_entries(file1_path):
     title = entry.get("title")
     doi = entry.get("doi")
     if title and doi:
         doi_mapping[title] = doi
 
-# Load the second file.
-with open(file2_path, 'r', encoding='utf-8') as f:
-    data2 = json.load(f)
-
-# Iterate through each entry in the second file and add the DOI if available.
-for entry in data2.get("data", []):
-    title = entry.get("title")
-    if title in doi_mapping:
-        entry["doi"] = doi_mapping[title]
-    else:
-        # Optionally, handle entries with no matching DOI.
-        print(f"No DOI found for title '{title}'.")
-
-# Save the updated second file.
-with open(output_file2_path, 'w', encoding='utf-8') as f:
-    json.dump(data2, f, ensure_ascii=False, indent=4)
+# Go through the second file, add the DOI to each entry if available, and write the entries out as we go.
+other_fields = get_top_level_fields(file2_path)
+with JSONDatasetWriter(output_file2_path, other_fields.pop("version", None), other_fields=other_fields) as writer:
+    for entry in iter_entries(file2_path):
+        title = entry.get("title")
+        if title in doi_mapping:
+            entry["doi"] = doi_mapping[title]
+        else:
+            # Optionally, handle entries with no matching DOI.
+            print(f"No DOI found for title '{title}'.")
+        writer.write(entry)
 
 print(f"Updated file saved as '{output_file2_path}'.")
@@ -2,12 +2,25 @@ import re
 import os
 import json
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Collection, Dict, List, Optional
 import logging
+from functools import lru_cache
+
+# orjson is optional; it decodes large JSON files faster than the json module, and its JSONDecodeError
+# subclasses json.JSONDecodeError, so callers catch the same exception either way
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# dash variants normalised to a plain hyphen, with str.translate (much cheaper than a regex substitution)
+DASH_CHARACTERS = '–−—―'
+DASH_TRANSLATION_TABLE = str.maketrans({c: '-' for c in DASH_CHARACTERS})
+
 def load_metadata(filepath: str) -> Dict[str, Any]:
     """
     Load metadata from a JSON file.
@@ -17,8 +30,8 @@ def load_metadata(filepath: str) -> Dict[str, Any]:
         Dict[str, Any]: Loaded metadata dictionary.
     """
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(filepath, "rb") as f:
+            return _json_loads(f.read())
     except FileNotFoundError:
         logging.error(f"Metadata file not found: {filepath}")
         raise
@@ -33,6 +46,7 @@ except (FileNotFoundError, json.JSONDecodeError):
     metadata = {}
 
 
+@lru_cache(maxsize=4096)
 def convert_article_name_to_doi(article_name: str) -> str:
     """
     Convert an article name to a DOI format.
@@ -46,6 +60,7 @@ def convert_article_name_to_doi(article_name: str) -> str:
     return article_name.replace("-", "/", 1)
 
 
+@lru_cache(maxsize=8192)
 def get_metadata(doi: str, info: str) -> Optional[Any]:
     """
     Retrieve metadata information for a given DOI.
@@ -59,18 +74,32 @@ def get_metadata(doi: str, info: str) -> Optional[Any]:
     return metadata.get(doi, {}).get(info)
 
 
-def generate_unique_id(existing_ids: List[str]) -> str:
+def clear_metadata_caches() -> None:
+    """
+    Clear the caches of convert_article_name_to_doi and get_metadata, e.g. after replacing the metadata.
+    """
+    convert_article_name_to_doi.cache_clear()
+    get_metadata.cache_clear()
+
+
+# uuid4 has 122 random bits, so even a single collision is practically impossible; more than this many in a row means something is broken
+MAX_UNIQUE_ID_ATTEMPTS = 4
+
+def generate_unique_id(existing_ids: Collection[str]) -> str:
     """
     Generate a new unique custom ID.
     Args:
-        existing_ids (List[str]): A list of existing IDs to check against.
+        existing_ids (Collection[str]): The existing IDs to check against; pass a set for O(1) membership checks.
     Returns:
         str: A new unique ID.
+    Raises:
+        RuntimeError: If no unique ID is found within MAX_UNIQUE_ID_ATTEMPTS attempts.
     """
-    while True:
+    for _ in range(MAX_UNIQUE_ID_ATTEMPTS):
         new_id = uuid.uuid4().hex
         if new_id not in existing_ids:
             return new_id
+    raise RuntimeError(f"Could not generate a unique ID in {MAX_UNIQUE_ID_ATTEMPTS} attempts")
 
 
 def find_key_by_value(element: Any, dictionary: Dict[Any, List[Any]]) -> Optional[Any]:
@@ -85,9 +114,24 @@ def find_key_by_value(element: Any, dictionary: Dict[Any, List[Any]]) -> Optiona
     return next((key for key, values in dictionary.items() if element in values), None)
 
 
+def build_reverse_index(dictionary: Dict[Any, List[Any]]) -> Dict[Any, Any]:
+    """
+    Build a reverse index mapping every element of the dictionary values to its key, for repeated lookups.
+    Where an element appears under several keys, it maps to the first one, as in find_key_by_value.
+    Args:
+        dictionary (Dict[Any, List[Any]]): The dictionary to index; its values must hold hashable elements.
+    Returns:
+        Dict[Any, Any]: The reverse index; reverse_index.get(element) is equivalent to find_key_by_value(element, dictionary).
+    """
+    return {element: key for key, values in reversed(dictionary.items()) for element in values}
+
+
 def decode_unicode(data: Any) -> Any:
 
     if isinstance(data, str):
+        # nothing to decode in plain ASCII without escapes, so skip the round trip through the codec
+        if data.isascii() and '\\' not in data:
+            return data
         return data.encode('utf-8').decode('unicode_escape')
     elif isinstance(data, list):
         return [decode_unicode(item) for item in data]
@@ -99,17 +143,16 @@ def decode_unicode(data: Any) -> Any:
 def load_or_create_dict(path: str) -> Dict[Any, Any]:
 
     directory = os.path.dirname(path)
-    if directory and not os.path.exists(directory):
-        os.makedirs(directory)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
     
-    if not os.path.exists(path):
+    try:
+        with open(path, 'rb') as file:
+            return _json_loads(file.read())
+    except FileNotFoundError:
         with open(path, 'w') as file:
             json.dump({}, file)
         return {}
-    
-    try:
-        with open(path, 'r') as file:
-            return json.load(file)
     except json.JSONDecodeError:
         logging.error(f"Invalid JSON in file: {path}")
         return {}
@@ -118,8 +161,8 @@ def load_or_create_dict(path: str) -> Dict[Any, Any]:
 def load_json(file_path: str) -> Any:
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        with open(file_path, 'rb') as file:
+            return _json_loads(file.read())
     except FileNotFoundError:
         logging.error(f"File not found: {file_path}")
         raise
@@ -127,11 +170,17 @@ def load_json(file_path: str) -> Any:
         logging.error(f"Invalid JSON in file: {file_path}")
         raise
 
-def save_json(data: Any, filepath: str) -> None:
-
+def save_json(data: Any, filepath: str, indent: Optional[int] = 4) -> None:
+    """
+    Save data to a JSON file, streaming it to the file rather than building the whole string first.
+    Args:
+        data (Any): The data to save.
+        filepath (str): Path to the output JSON file.
+        indent (Optional[int]): Indentation level; None writes compact JSON, which is faster.
+    """
     try:
         with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+            json.dump(data, f, ensure_ascii=False, indent=indent)
     except IOError as e:
         logging.error(f"Error saving JSON file: {e}")
         raise
@@ -147,65 +196,78 @@ def load_contexts(file_path):
     Returns:
         list: A list of unique contexts.
     """
-    with open(file_path, 'r', encoding='utf-8') as file:
-        data = json.load(file)
+    with open(file_path, 'rb') as file:
+        data = _json_loads(file.read())
     
-    contexts = []
-    original_contexts = []
-    for article in data['data']:
-        for paragraph in article['paragraphs']:
-            context = paragraph['context']
-            original_contexts.append(context)
-            if context not in contexts:
-                contexts.append(context)
+    original_contexts = [paragraph['context'] for article in data['data'] for paragraph in article['paragraphs']]
+    # de-duplicated in a single pass, keeping the order of first appearance
+    contexts = list(dict.fromkeys(original_contexts))
     
-    print("Original number of contexts:", len(original_contexts))
-    print("Number of unique contexts returned:", len(contexts))
+    logging.info("Original number of contexts: %d", len(original_contexts))
+    logging.info("Number of unique contexts returned: %d", len(contexts))
     return contexts
 
 
+# the digit after the last letter of the dataset name (e.g. "..._v2.json", "...sp1"), with or without ".json"
+_VERSION_RE = re.compile(r'[vspcf](\d)(?:\.json)?$')
+
 def get_version_from_dataset_name(dataset_name):
 
-    if dataset_name.endswith(".json"):
-        dataset_name = dataset_name.replace(".json", "")   
-    version = "v" + re.search(r'[vspcf](\d)$', dataset_name).group(1)
-    print(f"Version deduced: {version}")
+    match = _VERSION_RE.search(dataset_name)
+    if match is None:
+        raise ValueError(f"Cannot deduce the version from the dataset name: {dataset_name}")
+    version = "v" + match.group(1)
+    logging.debug("Version deduced: %s", version)
     return version
 
-def recover_leading_spaces(text, chars, start=0, current="", results=None):
+def recover_leading_spaces(text, chars, max_results=10):
     """
-    Recursively insert spaces before specified characters in a string.
+    Insert spaces before specified characters in a string, in every combination (up to a limit).
 
     Args:
         text (str): The original text to process.
-        chars (str): Characters before which spaces should be inserted.
-        start (int): The current index in the text being processed.
-        current (str): The current state of the processed text.
-        results (list): A list to collect the combinations.
+        chars (str): Characters before which spaces should be inserted (never before the first character).
+        max_results (int): The maximum number of texts returned, the original one included.
 
     Returns:
-        list: A list of combinations with spaces inserted before specified characters.
+        list: The original text, followed by the combinations with spaces inserted before specified characters.
     """
-    if results is None:
-        results = [text]
-    
-    if start >= len(text) or len(results) >= 10:
-        if len(results) < 10:
-            results.append(current)
-        return results
-    
-    if text[start] in chars:
-        if len(results) < 10:
-            if start > 0:
-                recover_leading_spaces(text, chars, start + 1, current + " " + text[start], results)
-            if len(results) < 10:
-                recover_leading_spaces(text, chars, start + 1, current + text[start], results)
-    else:
-        recover_leading_spaces(text, chars, start + 1, current + text[start], results)
-    
+    results = [text]
+    positions = [i for i in range(1, len(text)) if text[i] in chars]
+    number_of_positions = len(positions)
+
+    # each combination is a bitmask over the positions, the first position being the most significant bit;
+    # a 0 bit inserts a space, so the combinations come out in the same order as a depth-first search trying
+    # the space first at each position
+    for combination in range(min(1 << number_of_positions, max_results - 1)):
+        parts = []
+        previous = 0
+        for bit, position in enumerate(positions):
+            if not (combination >> (number_of_positions - 1 - bit)) & 1:
+                parts.append(text[previous:position])
+                parts.append(" ")
+                previous = position
+        parts.append(text[previous:])
+        results.append("".join(parts))
+
     return results
 
 
+_WHITESPACE_RE = re.compile(r"\s")
+
+
+@lru_cache(maxsize=None)
+def get_space_before_pattern(char: str) -> "re.Pattern":
+    """Compiled pattern matching a whitespace character followed by char (any whitespace if char is empty)."""
+    return re.compile(r"\s(?=" + re.escape(char) + ")")
+
+
+@lru_cache(maxsize=None)
+def get_space_after_pattern(char: str) -> "re.Pattern":
+    """Compiled pattern matching a whitespace character preceded by char (any whitespace if char is empty)."""
+    return re.compile("(?<=" + re.escape(char) + r")\s")
+
+
 def remove_leading_and_trailing_spaces(text, lead_remove, trail_remove):
     """
     Remove leading and trailing spaces around specified characters.
@@ -219,12 +281,17 @@ def remove_leading_and_trailing_spaces(text, lead_remove, trail_remove):
         list: A list of variations of the text with spaces removed.
     """
     texts = []
+    seen = set()
 
     for lead_char in list(lead_remove) + ['']:
-        text = re.sub(f"\s{lead_char}", f"{lead_char}", text)
+        text = get_space_before_pattern(lead_char).sub("", text)
         for trail_char in list(trail_remove) + ['']:
-            text = re.sub(f"{trail_char}\s", f"{trail_char}", text)
-            if text not in texts:
+            text = get_space_after_pattern(trail_char).sub("", text)
+            if text not in seen:
+                seen.add(text)
                 texts.append(text)
+        # removals are cumulative and all need a space, so once none is left there is nothing more to vary
+        if not _WHITESPACE_RE.search(text):
+            break
     
     return texts
\ No newline at end of file